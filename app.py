@@ -3,38 +3,538 @@ Flask Web API wrapper for LBC (Le Bon Coin) client
 Deploy this to Render to use LBC API in your web applications
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask import Flask, Response, request
+from flask_compress import Compress
 import lbc
+import orjson
 from lbc.models import Category, AdType, OwnerType, Sort, Region, Department, City, Proxy
-from lbc.exceptions import DatadomeError, RequestError, NotFoundError
+from lbc.exceptions import DatadomeError, RequestError, NotFoundError, InvalidValue
 import logging
 import os
 import time
 import random
+import threading
+import operator
+import functools
+import itertools
+import hashlib
+import base64
+import contextlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Optional, List, Union
 
+try:
+    import redis
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+except ImportError:  # redis is optional, only needed to share rate limits between workers
+    redis = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
 
-# Initialize LBC client
-client = lbc.Client()
+# Enable CORS for the origins listed in CORS_ORIGINS (comma-separated, defaults to any origin).
+# Preflight responses are cached by browsers for 24h.
+CORS_ORIGINS = frozenset(origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',') if origin.strip())
+
+@app.after_request
+def _add_cors_headers(response):
+    """
+    Add CORS headers to every response
+
+    Preflight requests are answered by Flask's automatic OPTIONS handling, this
+    only adds the static Access-Control-* headers to them.
+    """
+    if '*' in CORS_ORIGINS:
+        response.headers['Access-Control-Allow-Origin'] = '*'
+    else:
+        response.vary.add('Origin')
+        origin = request.headers.get('Origin')
+        if origin not in CORS_ORIGINS:
+            return response
+        response.headers['Access-Control-Allow-Origin'] = origin
+    
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, If-None-Match'
+        response.headers['Access-Control-Max-Age'] = '86400'
+    return response
+
+# Compress JSON responses for clients that accept it. Compression rewrites the
+# ETag, so If-None-Match is re-evaluated against the compressed validator.
+# Streamed search bodies are left uncompressed: Flask-Compress would buffer the
+# whole generator before sending anything.
+app.config['COMPRESS_EVALUATE_CONDITIONAL_REQUEST'] = True
+app.config['COMPRESS_STREAMS'] = False
+_compress = Compress(app)
+
+# Shared LBC client, created on first use so that each gunicorn worker
+# builds (and keeps reusing) its own connection pool
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the process-wide LBC client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = lbc.Client()
+    return _client
+
+def _dumps(obj):
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+def _json(obj, status=200):
+    """Serialize `obj` with orjson and wrap it in a JSON response"""
+    return Response(_dumps(obj), status=status, mimetype='application/json')
+
+# Enum lookup tables used to resolve names sent in request payloads
+_CATEGORY_BY_NAME = dict(Category.__members__)
+_SORT_BY_NAME = dict(Sort.__members__)
+_AD_TYPE_BY_NAME = dict(AdType.__members__)
+_OWNER_TYPE_BY_NAME = dict(OwnerType.__members__)
+_REGION_BY_NAME = dict(Region.__members__)
+_DEPARTMENT_BY_NAME = dict(Department.__members__)
+
+def _etag(body):
+    return hashlib.md5(body).hexdigest()
+
+def _conditional(response, etag=None):
+    """Tag `response` with an ETag and turn it into a 304 when the client already has this version"""
+    etag = etag or _etag(response.get_data())
+    # Flask-Compress tags compressed bodies "<etag>:<algorithm>", accept those
+    # too so that a 304 is decided before the body gets compressed again
+    for tag in request.if_none_match.as_set():
+        if tag.partition(':')[0] == etag:
+            etag = tag
+            break
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def _load_json():
+    """Parse the request body with orjson, raising `InvalidValue` if it is not valid JSON"""
+    try:
+        return orjson.loads(request.get_data(cache=False) or b'{}')
+    except orjson.JSONDecodeError:
+        raise InvalidValue("Request body is not valid JSON.") from None
+
+def _load_query():
+    """Parse the `q` query parameter, a base64url-encoded JSON payload, raising `InvalidValue` if it is malformed"""
+    value = request.args.get('q', '')
+    try:
+        return orjson.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)) or b'{}')
+    except ValueError:
+        raise InvalidValue("'q' must be a base64url-encoded JSON object.") from None
+
+def _lookup(table, name, default=None):
+    """Resolve an enum member from its case-insensitive name, or return `default`"""
+    if not isinstance(name, str):
+        return default
+    return table.get(name.upper(), default)
+
+def _location_to_dict(loc):
+    return {
+        "city": loc.city,
+        "region_name": loc.region_name,
+        "department_name": loc.department_name,
+        "zipcode": loc.zipcode,
+        "lat": loc.lat,
+        "lng": loc.lng
+    }
+
+def _attributes_to_list(attributes):
+    return [
+        {
+            "key": attr.key,
+            "key_label": attr.key_label,
+            "value": attr.value,
+            "value_label": attr.value_label
+        }
+        for attr in attributes
+    ]
+
+# Ad fields that can be selected with `?fields=`, and how to read each one
+_AD_GETTERS = {
+    "id": operator.attrgetter("id"),
+    "title": operator.attrgetter("subject"),
+    "description": operator.attrgetter("body"),
+    "price": operator.attrgetter("price"),
+    "url": operator.attrgetter("url"),
+    "images": operator.attrgetter("images"),
+    "category_name": operator.attrgetter("category_name"),
+    "ad_type": operator.attrgetter("ad_type"),
+    "first_publication_date": operator.attrgetter("first_publication_date"),
+    "expiration_date": operator.attrgetter("expiration_date"),
+    "location": lambda ad: _location_to_dict(ad.location),
+    "attributes": lambda ad: _attributes_to_list(ad.attributes),
+    "has_phone": operator.attrgetter("has_phone"),
+    "user_id": operator.attrgetter("_user_id"),
+}
+
+def _ad_to_dict(ad, fields=None):
+    """Convert an `Ad` to a JSON-serializable dict, restricted to `fields` when given"""
+    if fields is not None:
+        return {name: _AD_GETTERS[name](ad) for name in fields}
+    
+    return {
+        "id": ad.id,
+        "title": ad.subject,
+        "description": ad.body,
+        "price": ad.price,
+        "url": ad.url,
+        "images": ad.images,
+        "category_name": ad.category_name,
+        "ad_type": ad.ad_type,
+        "first_publication_date": ad.first_publication_date,
+        "expiration_date": ad.expiration_date,
+        "location": _location_to_dict(ad.location),
+        "attributes": _attributes_to_list(ad.attributes),
+        "has_phone": ad.has_phone,
+        "user_id": ad._user_id
+    }
+
+def _requested_fields():
+    """
+    Parse the optional `?fields=id,title,price` query parameter
+
+    Returns the selected ad fields in request order, or None to return every field.
+
+    Raises:
+        InvalidValue: Raised when an unknown field is requested.
+    """
+    value = request.args.get('fields')
+    if not value:
+        return None
+    
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in _AD_GETTERS]
+    if unknown:
+        raise InvalidValue(f"Unknown fields: {', '.join(unknown)}")
+    return fields or None
+
+def _user_to_dict(user):
+    """Convert a `User` to a JSON-serializable dict"""
+    return {
+        "id": user.id,
+        "name": user.name,
+        "pro": user.pro,
+        "account_type": user.account_type,
+        "creation_date": user.creation_date,
+        "phone_verified": user.phone_verified,
+        "email_verified": user.email_verified
+    }
+
+def _stream_search(result, cache_key=None, fields=None):
+    """
+    Yield the JSON encoding of a `Search` result, one ad at a time
+
+    Ads are restricted to `fields` when given. When `cache_key` is given, the
+    complete body is stored in the response cache once the last chunk has been sent.
+    """
+    header = {
+        "total": result.total,
+        "total_all": result.total_all,
+        "total_pro": result.total_pro,
+        "total_private": result.total_private,
+        "total_active": result.total_active,
+        "total_inactive": result.total_inactive,
+        "total_shippable": result.total_shippable,
+        "max_pages": result.max_pages
+    }
+    # Reopen the header object to append the ads array to it
+    chunks = [orjson.dumps(header)[:-1] + b',"ads":[']
+    yield chunks[0]
+    # Local aliases, this loop runs once per ad
+    dumps, ad_to_dict, append = orjson.dumps, _ad_to_dict, chunks.append
+    for index, ad in enumerate(result.ads):
+        chunk = dumps(ad_to_dict(ad, fields))
+        if index:
+            chunk = b',' + chunk
+        append(chunk)
+        yield chunk
+    chunks.append(b']}')
+    yield chunks[-1]
+
+    if cache_key is not None:
+        _response_cache.set(cache_key, b''.join(chunks))
+
+def _freeze(value):
+    """Return a hashable version of a JSON value, used to build cache keys"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, City):
+        return (value.lat, value.lng, value.radius, value.city)
+    return value
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being stored
+
+    When `maxbytes` is given, the least recently used entries are also evicted
+    once the sizes reported by `sizeof` add up to more than `maxbytes`.
+    """
+    def __init__(self, maxsize=512, ttl=30, maxbytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value for `key`, or None if it is missing or expired"""
+        return self.get_with_ttl(key)[0]
+    
+    def get_with_ttl(self, key):
+        """Return the cached value for `key` and its remaining lifetime in seconds, or (None, 0)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, 0
+            
+            expires_at, value, size = entry
+            remaining = expires_at - time.monotonic()
+            if remaining < 0:
+                del self._entries[key]
+                self._size -= size
+                return None, 0
+            
+            self._entries.move_to_end(key)
+            return value, remaining
+    
+    def set(self, key, value):
+        """Store `value` under `key`, evicting the least recently used entries"""
+        size = self._sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            self._entries[key] = (time.monotonic() + self.ttl, value, size)
+            self._size += size
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self._size > self.maxbytes):
+                self._size -= self._entries.popitem(last=False)[1][2]
+
+def _cached_size(value):
+    """Approximate memory held by a cache entry: the body length, or the JSON length of an ad summary"""
+    return len(value) if isinstance(value, bytes) else len(_dumps(value))
+
+# Serialized responses of the read-only endpoints, keyed on their normalized parameters.
+# Each gunicorn worker keeps its own copy, so the bodies are capped per worker.
+CACHE_TTL = int(os.environ.get('LBC_CACHE_TTL', '120'))
+CACHE_MAX_BYTES = int(os.environ.get('LBC_CACHE_MAX_MB', '32')) * 1024 * 1024
+_response_cache = TTLCache(maxsize=2048, ttl=CACHE_TTL, maxbytes=CACHE_MAX_BYTES, sizeof=_cached_size)
+
+def _cacheable(response, max_age=CACHE_TTL):
+    """
+    Let clients reuse `response` for `max_age` seconds
+
+    Pass the remaining lifetime of a cache hit, so that clients don't keep it
+    longer than the server-side cache does. Shared caches (CDN, reverse proxy)
+    keep it for up to a minute of that and may serve it a little longer while
+    they refetch it in the background.
+    """
+    max_age = int(max_age)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}, s-maxage={min(max_age, 60)}, stale-while-revalidate=30'
+    return response
+
+# Repeated searches around the same place share one `City`, lbc only reads it
+@functools.lru_cache(maxsize=4096)
+def _city(lat, lng, radius, city):
+    return City(lat=lat, lng=lng, radius=radius, city=city)
+
+def _build_city(loc_data):
+    if 'lat' not in loc_data or 'lng' not in loc_data:
+        raise InvalidValue("City locations require 'lat' and 'lng'.")
+    
+    lat, lng = loc_data['lat'], loc_data['lng']
+    radius, city = loc_data.get('radius', 10000), loc_data.get('city')
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in (lat, lng, radius)):
+        raise InvalidValue("City 'lat', 'lng' and 'radius' must be numbers.")
+    if city is not None and not isinstance(city, str):
+        raise InvalidValue("City 'city' must be a string.")
+    
+    return _city(lat, lng, radius, city)
+
+def _build_region(loc_data):
+    return _lookup(_REGION_BY_NAME, loc_data.get('name'))
+
+def _build_department(loc_data):
+    return _lookup(_DEPARTMENT_BY_NAME, loc_data.get('name'))
+
+# Location parsers keyed on the "type" of a location payload, unknown types are skipped
+_LOCATION_BUILDERS = {
+    'city': _build_city,
+    'region': _build_region,
+    'department': _build_department
+}
+
+# Payload keys forwarded to `Client.search` as additional filters
+_FILTER_KEYS = ('square', 'price', 'rooms', 'bedrooms', 'real_estate_type', 'shippable')
+
+# Largest page a search may ask for, each cached body grows with it
+_MAX_LIMIT = 100
+
+def _positive_int(data, key, default, maximum=None):
+    """Read an optional positive integer field from a request payload, up to `maximum` when given"""
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise InvalidValue(f"'{key}' must be a positive integer.")
+    if maximum is not None and value > maximum:
+        raise InvalidValue(f"'{key}' must be at most {maximum}.")
+    return value
+
+@dataclass
+class SearchRequest:
+    text: Optional[str]
+    category: Category
+    sort: Sort
+    locations: List[Union[Region, Department, City]]
+    page: int
+    limit: int
+    ad_type: AdType
+    owner_type: Optional[OwnerType]
+    search_in_title_only: bool
+    filters: dict
+
+    @staticmethod
+    def _build(data: dict) -> "SearchRequest":
+        """
+        Validate a `/api/search` JSON payload and convert it to typed search parameters.
+
+        Raises:
+            InvalidValue: Raised when a field has an unusable type or value.
+        """
+        if not isinstance(data, dict):
+            raise InvalidValue("The search payload must be a JSON object.")
+        
+        text = data.get('text')
+        if text is not None and not isinstance(text, str):
+            raise InvalidValue("'text' must be a string.")
+        
+        locations_data = data.get('locations', [])
+        if not isinstance(locations_data, list):
+            raise InvalidValue("'locations' must be a list.")
+        
+        locations = []
+        for loc_data in locations_data:
+            if not isinstance(loc_data, dict):
+                raise InvalidValue("Each location must be an object.")
+            
+            builder = _LOCATION_BUILDERS.get(loc_data.get('type', 'city'))
+            location = builder(loc_data) if builder else None
+            if location is not None:
+                locations.append(location)
+        
+        # Prepare additional filters
+        filters = {key: data[key] for key in _FILTER_KEYS if key in data}
+        
+        return SearchRequest(
+            text=text,
+            category=_lookup(_CATEGORY_BY_NAME, data.get('category'), Category.TOUTES_CATEGORIES),
+            sort=_lookup(_SORT_BY_NAME, data.get('sort'), Sort.RELEVANCE),
+            locations=locations,
+            page=_positive_int(data, 'page', 1),
+            limit=_positive_int(data, 'limit', 35, _MAX_LIMIT),
+            ad_type=_lookup(_AD_TYPE_BY_NAME, data.get('ad_type'), AdType.OFFER),
+            owner_type=_lookup(_OWNER_TYPE_BY_NAME, data.get('owner_type')),
+            search_in_title_only=bool(data.get('search_in_title_only', False)),
+            filters=filters
+        )
+
+    @property
+    def cache_key(self) -> tuple:
+        return (
+            "search", self.text, self.category, self.sort, _freeze(self.locations),
+            self.page, self.limit, self.ad_type, self.owner_type,
+            self.search_in_title_only, _freeze(self.filters)
+        )
+
+@dataclass
+class SearchByUrlRequest:
+    url: str
+    page: int
+    limit: int
+
+    @staticmethod
+    def _build(data: dict) -> "SearchByUrlRequest":
+        """
+        Validate a `/api/search-url` JSON payload.
+
+        Raises:
+            InvalidValue: Raised when a field has an unusable type or value.
+        """
+        if not isinstance(data, dict):
+            raise InvalidValue("The search payload must be a JSON object.")
+        
+        url = data.get('url')
+        if not url:
+            raise InvalidValue("URL is required")
+        if not isinstance(url, str):
+            raise InvalidValue("'url' must be a string.")
+        
+        return SearchByUrlRequest(
+            url=url,
+            page=_positive_int(data, 'page', 1),
+            limit=_positive_int(data, 'limit', 35, _MAX_LIMIT)
+        )
+
+    @property
+    def cache_key(self) -> tuple:
+        return ("search-url", self.url, self.page, self.limit)
+
+# Shared rate limiting: with REDIS_URL set, every gunicorn worker reserves its
+# request slots from the same Redis keys instead of keeping its own timestamps
+REDIS_URL = os.environ.get('REDIS_URL')
+# Seconds to rate limit per worker after a Redis error before trying Redis again
+_REDIS_COOLDOWN = 30
+
+# Reserve the next request slot for KEYS[1]. ARGV[1] is the minimum spacing and
+# ARGV[2] the spacing to apply (with jitter) when the proxy was used too recently,
+# both in milliseconds. Returns how long the caller has to wait, in milliseconds.
+_RATE_LIMIT_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local last_ms = tonumber(redis.call('GET', KEYS[1]) or '0')
+local scheduled_ms = now_ms
+if now_ms - last_ms < tonumber(ARGV[1]) then
+    scheduled_ms = last_ms + tonumber(ARGV[2])
+end
+redis.call('SET', KEYS[1], scheduled_ms, 'PX', scheduled_ms - now_ms + tonumber(ARGV[2]) + 1000)
+return scheduled_ms - now_ms
+"""
 
 # Datadome protection strategies
 class DatadomeProtection:
     def __init__(self):
         self.request_count = 0
-        self.last_request_time = 0
+        self._last_request_times = {}
+        self._rate_limit_lock = threading.Lock()
+        self._rate_limit_script = None
+        self._redis_retry_at = 0
+        if REDIS_URL and redis is not None:
+            # Fail fast and without retries, a request must not wait on Redis
+            self._rate_limit_script = redis.Redis.from_url(
+                REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5, retry=Retry(NoBackoff(), 0)
+            ).register_script(_RATE_LIMIT_SCRIPT)
+        elif REDIS_URL:
+            logger.warning("REDIS_URL is set but redis is not installed, rate limiting per worker")
         self.min_delay = 2  # Minimum delay between requests in seconds
         self.max_delay = 5  # Maximum delay between requests in seconds
         
         # Proxy rotation (you can add your proxies here)
         self.proxies = self._load_proxies()
-        self.current_proxy_index = 0
+        self._proxy_cycle = itertools.cycle(self.proxies)
+        self._proxy_lock = threading.Lock()
+        self._clients = {}
         
         # User agents rotation
         self.user_agents = [
@@ -44,6 +544,7 @@ class DatadomeProtection:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         ]
+        self._ua_choice = random.choice
     
     def _load_proxies(self):
         """Load proxies from ProxyScrape premium list"""
@@ -61,19 +562,19 @@ class DatadomeProtection:
                     line = line.strip()
                     if line and ':' in line:
                         host, port = line.split(':', 1)
-                        proxies.append({
-                            "host": host.strip(),
-                            "port": int(port.strip()),
-                            "username": None,  # No authentication for these proxies
-                            "password": None
-                        })
+                        proxies.append(Proxy(
+                            host=host.strip(),
+                            port=int(port.strip()),
+                            username=None,  # No authentication for these proxies
+                            password=None
+                        ))
                 
-                logger.info(f"Loaded {len(proxies)} proxies from ProxyScrape premium list")
+                logger.info("Loaded %d proxies from ProxyScrape premium list", len(proxies))
             else:
                 logger.warning("ProxyScrape premium list not found, using empty proxy list")
                 
-        except Exception as e:
-            logger.error(f"Error loading proxies: {e}")
+        except Exception:
+            logger.exception("Error loading proxies")
             proxies = []
         
         return proxies
@@ -83,80 +584,206 @@ class DatadomeProtection:
         if not self.proxies:
             return None
         
-        proxy_config = self.proxies[self.current_proxy_index]
-        self.current_proxy_index = (self.current_proxy_index + 1) % len(self.proxies)
-        
-        return Proxy(
-            host=proxy_config["host"],
-            port=proxy_config["port"],
-            username=proxy_config.get("username"),
-            password=proxy_config.get("password")
-        )
+        # next() on a shared cycle is not atomic, concurrent threads could otherwise get the same proxy
+        with self._proxy_lock:
+            return next(self._proxy_cycle)
     
     def get_random_user_agent(self):
         """Get a random user agent"""
-        return random.choice(self.user_agents)
+        return self._ua_choice(self.user_agents)
     
-    def apply_rate_limiting(self):
-        """Apply rate limiting between requests"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_delay:
-            sleep_time = self.min_delay - time_since_last
-            # Add some randomness to avoid detection
-            sleep_time += random.uniform(0, self.max_delay - self.min_delay)
-            logger.info(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+    @staticmethod
+    def _proxy_key(proxy):
+        return (proxy.host, proxy.port) if proxy else None
+    
+    def _next_delay(self):
+        # Add some randomness to avoid detection
+        return self.min_delay + random.uniform(0, self.max_delay - self.min_delay)
+    
+    def _reserve_local_slot(self, proxy):
+        key = self._proxy_key(proxy)
+        with self._rate_limit_lock:
+            current_time = time.time()
+            scheduled_time = current_time
+            last_request_time = self._last_request_times.get(key, 0)
+            
+            if current_time - last_request_time < self.min_delay:
+                scheduled_time = last_request_time + self._next_delay()
+            
+            self._last_request_times[key] = scheduled_time
+        
+        return scheduled_time - current_time
+    
+    def _reserve_shared_slot(self, proxy):
+        key = f"rl:lbc:{proxy.host}:{proxy.port}" if proxy else "rl:lbc:direct"
+        sleep_ms = self._rate_limit_script(
+            keys=[key],
+            args=[int(self.min_delay * 1000), int(self._next_delay() * 1000)]
+        )
+        return int(sleep_ms) / 1000
+    
+    def apply_rate_limiting(self, proxy=None):
+        """
+        Apply rate limiting between requests sent through the same proxy
+        
+        Each exit IP keeps its own budget. Callers reserve the next free slot for
+        their proxy, then sleep without holding any lock, so concurrent requests
+        are spaced out without serializing every worker thread behind a single
+        sleep. Slots are reserved in Redis when it is configured, so the budget
+        holds across all gunicorn workers, and locally otherwise.
+        """
+        sleep_time = None
+        if self._rate_limit_script is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                sleep_time = self._reserve_shared_slot(proxy)
+            except redis.RedisError as e:
+                # Don't pay the Redis timeout on every request while it is down
+                self._redis_retry_at = time.monotonic() + _REDIS_COOLDOWN
+                logger.warning("Shared rate limiting unavailable, rate limiting per worker for %ds: %s", _REDIS_COOLDOWN, e)
+        if sleep_time is None:
+            sleep_time = self._reserve_local_slot(proxy)
+        
+        with self._rate_limit_lock:
+            self.request_count += 1
         
-        self.last_request_time = time.time()
-        self.request_count += 1
+        if sleep_time > 0:
+            logger.info("Rate limiting: sleeping for %.2f seconds", sleep_time)
+            time.sleep(sleep_time)
     
-    def create_client_with_protection(self):
-        """Create a new client with Datadome protection"""
-        proxy = self.get_next_proxy()
+    def get_client(self, proxy=None):
+        """
+        Get the client bound to `proxy` (or the direct-connection client)
+        
+        Clients are cached per proxy, so their sessions, cookies and open
+        connections are reused instead of being rebuilt for every request.
+        Building a client primes its cookies through the proxy, so it happens
+        without any lock held; if two threads race, the first client stored wins.
+        """
+        key = self._proxy_key(proxy)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients.setdefault(key, lbc.Client(proxy=proxy))
         
-        # Create client with proxy if available
         if proxy:
-            logger.info(f"Using proxy: {proxy.host}:{proxy.port}")
-            return lbc.Client(proxy=proxy)
+            logger.info("Using proxy: %s:%s", proxy.host, proxy.port)
         else:
             logger.info("No proxy available, using direct connection")
-            return lbc.Client()
+        return client
     
-    def retry_with_backoff(self, func, max_retries=3):
-        """Retry function with exponential backoff for Datadome errors"""
+    def retry_with_backoff(self, func, max_retries=3, backoff=True):
+        """
+        Retry function with exponential backoff for Datadome errors, other errors propagate immediately
+        
+        With `backoff=False` retries are issued right away, for callers that move
+        to a different exit IP on every attempt.
+        """
         for attempt in range(max_retries):
             try:
                 return func()
-            except DatadomeError as e:
+            except DatadomeError:
                 if attempt == max_retries - 1:
-                    raise e
+                    raise
+                
+                if not backoff:
+                    logger.warning("Datadome error on attempt %d, retrying through the next proxy", attempt + 1)
+                    continue
                 
                 # Exponential backoff: 2^attempt seconds
                 wait_time = 2 ** attempt + random.uniform(0, 1)
-                logger.warning(f"Datadome error on attempt {attempt + 1}, retrying in {wait_time:.2f} seconds")
+                logger.warning("Datadome error on attempt %d, retrying in %.2f seconds", attempt + 1, wait_time)
                 time.sleep(wait_time)
-                
-                # Create a new client for retry
-                self.create_client_with_protection()
-            except Exception as e:
-                # For non-Datadome errors, don't retry
-                raise e
 
 # Initialize protection manager
 protection = DatadomeProtection()
 
+# Thread pool used to run several upstream calls concurrently in a single API call
+_MAX_BATCH_ADS = 50
+_MAX_BATCH_SEARCHES = 10
+_pool = ThreadPoolExecutor(max_workers=16)
+# Upstream calls a single API request may run at once. Each call can sleep in the
+# rate limiter while it holds a pool thread, so one large batch must not take them all.
+_MAX_TASKS_PER_REQUEST = 4
+
+def _map_bounded(func, items, *args):
+    """
+    Yield a future of `func(item, *args)` for each item, in order
+
+    At most `_MAX_TASKS_PER_REQUEST` of them are submitted to the pool at once, the
+    next one is submitted when the caller moves past the oldest. Futures that were
+    not yielded yet are cancelled when the generator is closed early.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            if len(pending) == _MAX_TASKS_PER_REQUEST:
+                yield pending.popleft()
+            pending.append(_pool.submit(func, item, *args))
+        while pending:
+            yield pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def _with_protection(call):
+    """Run `call(client)` through the next proxy, with rate limiting and Datadome retries"""
+    def attempt():
+        proxy = protection.get_next_proxy()
+        protection.apply_rate_limiting(proxy)
+        return call(protection.get_client(proxy))
+    
+    # Each attempt goes out through the next proxy, whose own rate limit already
+    # spaces requests, so only direct connections need to back off
+    return protection.retry_with_backoff(attempt, backoff=not protection.proxies)
+
+def _run_search(search):
+    """Run a `SearchRequest` through the next proxy, with rate limiting and Datadome retries"""
+    return _with_protection(lambda search_client: search_client.search(
+        text=search.text,
+        category=search.category,
+        sort=search.sort,
+        locations=search.locations if search.locations else None,
+        page=search.page,
+        limit=search.limit,
+        ad_type=search.ad_type,
+        owner_type=search.owner_type,
+        search_in_title_only=search.search_in_title_only,
+        **search.filters
+    ))
+
+def _ad_summary(ad_id):
+    """Return the `_ad_to_dict` form of an ad, from the cache when possible"""
+    cache_key = ("ad-summary", str(ad_id))
+    summary = _response_cache.get(cache_key)
+    if summary is None:
+        summary = _ad_to_dict(_with_protection(lambda ad_client: ad_client.get_ad(ad_id)))
+        _response_cache.set(cache_key, summary)
+    return summary
+
+def _search_body(search, fields=None):
+    """Return the serialized response of a `SearchRequest`, from the cache when possible"""
+    cache_key = search.cache_key + (fields,)
+    body = _response_cache.get(cache_key)
+    if body is None:
+        body = b''.join(_stream_search(_run_search(search), cache_key, fields))
+    return body
+
+def _batch_search_body(query, fields=None):
+    """Validate one query of a batch and return its serialized response"""
+    return _search_body(SearchRequest._build(query), fields)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for Render"""
-    return jsonify({"status": "healthy", "service": "lbc-api"})
+    return _json({"status": "healthy", "service": "lbc-api"})
 
-@app.route('/api/search', methods=['POST'])
+@app.route('/api/search', methods=['GET', 'POST'])
 def search_ads():
     """
     Search for ads on Le Bon Coin
     
+    The payload can also be sent as `GET /api/search?q=<base64url JSON>`,
+    which CDNs and browsers are able to cache.
+    
     Expected JSON payload:
     {
         "text": "search term",
@@ -181,165 +808,94 @@ def search_ads():
     }
     """
     try:
-        data = request.get_json()
+        data = _load_json() if request.method == 'POST' else _load_query()
         if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+            return _json({"error": "No JSON data provided"}, 400)
         
-        # Extract search parameters
-        text = data.get('text')
-        category_name = data.get('category', 'TOUTES_CATEGORIES')
-        sort_name = data.get('sort', 'RELEVANCE')
-        locations_data = data.get('locations', [])
-        page = data.get('page', 1)
-        limit = data.get('limit', 35)
-        ad_type_name = data.get('ad_type', 'OFFER')
-        owner_type_name = data.get('owner_type')
-        search_in_title_only = data.get('search_in_title_only', False)
+        search = SearchRequest._build(data)
+        fields = _requested_fields()
         
-        # Convert string enums to actual enum values
-        try:
-            category = getattr(Category, category_name.upper())
-        except AttributeError:
-            category = Category.TOUTES_CATEGORIES
-            
-        try:
-            sort = getattr(Sort, sort_name.upper())
-        except AttributeError:
-            sort = Sort.RELEVANCE
-            
-        try:
-            ad_type = getattr(AdType, ad_type_name.upper())
-        except AttributeError:
-            ad_type = AdType.OFFER
-            
-        owner_type = None
-        if owner_type_name:
-            try:
-                owner_type = getattr(OwnerType, owner_type_name.upper())
-            except AttributeError:
-                pass
-        
-        # Process locations
-        locations = []
-        for loc_data in locations_data:
-            loc_type = loc_data.get('type', 'city')
-            
-            if loc_type == 'city':
-                location = City(
-                    lat=loc_data['lat'],
-                    lng=loc_data['lng'],
-                    radius=loc_data.get('radius', 10000),
-                    city=loc_data['city']
-                )
-            elif loc_type == 'region':
-                try:
-                    location = getattr(Region, loc_data['name'].upper())
-                except AttributeError:
-                    continue
-            elif loc_type == 'department':
-                try:
-                    location = getattr(Department, loc_data['name'].upper())
-                except AttributeError:
-                    continue
-            else:
-                continue
-                
-            locations.append(location)
+        # Identical searches within the cache TTL are answered from memory
+        cache_key = search.cache_key + (fields,)
+        cached, max_age = _response_cache.get_with_ttl(cache_key)
+        if cached is None and request.method == 'HEAD':
+            # Werkzeug never iterates the body of a HEAD response, so a streamed
+            # search would be fetched and thrown away without reaching the cache
+            cached, max_age = _search_body(search, fields), CACHE_TTL
+        if cached is not None:
+            return _conditional(_cacheable(Response(cached, mimetype='application/json'), max_age))
         
-        # Prepare additional filters
-        filters = {}
-        if 'square' in data:
-            filters['square'] = data['square']
-        if 'price' in data:
-            filters['price'] = data['price']
-        if 'rooms' in data:
-            filters['rooms'] = data['rooms']
-        if 'bedrooms' in data:
-            filters['bedrooms'] = data['bedrooms']
-        if 'real_estate_type' in data:
-            filters['real_estate_type'] = data['real_estate_type']
-        if 'shippable' in data:
-            filters['shippable'] = data['shippable']
-        
-        # Apply rate limiting
-        protection.apply_rate_limiting()
-        
-        # Perform search with retry mechanism
-        def perform_search():
-            search_client = protection.create_client_with_protection()
-            return search_client.search(
-                text=text,
-                category=category,
-                sort=sort,
-                locations=locations if locations else None,
-                page=page,
-                limit=limit,
-                ad_type=ad_type,
-                owner_type=owner_type,
-                search_in_title_only=search_in_title_only,
-                **filters
-            )
-        
-        result = protection.retry_with_backoff(perform_search)
-        
-        # Convert result to JSON-serializable format
-        response_data = {
-            "total": result.total,
-            "total_all": result.total_all,
-            "total_pro": result.total_pro,
-            "total_private": result.total_private,
-            "total_active": result.total_active,
-            "total_inactive": result.total_inactive,
-            "total_shippable": result.total_shippable,
-            "max_pages": result.max_pages,
-            "ads": []
-        }
+        result = _run_search(search)
         
-        for ad in result.ads:
-            ad_data = {
-                "id": ad.id,
-                "title": ad.subject,
-                "description": ad.body,
-                "price": ad.price,
-                "url": ad.url,
-                "images": ad.images,
-                "category_name": ad.category_name,
-                "ad_type": ad.ad_type,
-                "first_publication_date": ad.first_publication_date,
-                "expiration_date": ad.expiration_date,
-                "location": {
-                    "city": ad.location.city,
-                    "region_name": ad.location.region_name,
-                    "department_name": ad.location.department_name,
-                    "zipcode": ad.location.zipcode,
-                    "lat": ad.location.lat,
-                    "lng": ad.location.lng
-                },
-                "attributes": [
-                    {
-                        "key": attr.key,
-                        "key_label": attr.key_label,
-                        "value": attr.value,
-                        "value_label": attr.value_label
-                    }
-                    for attr in ad.attributes
-                ],
-                "has_phone": ad.has_phone,
-                "user_id": ad._user_id
-            }
-            response_data["ads"].append(ad_data)
-        
-        return jsonify(response_data)
+        return _cacheable(Response(_stream_search(result, cache_key, fields), mimetype='application/json'))
         
+    except InvalidValue as e:
+        return _json({"error": str(e)}, 400)
     except DatadomeError as e:
-        logger.error(f"Datadome error: {e}")
-        return jsonify({"error": "Access blocked by Datadome protection. Please try again later."}), 403
+        logger.error("Datadome error: %s", e)
+        return _json({"error": "Access blocked by Datadome protection. Please try again later."}, 403)
     except RequestError as e:
-        logger.error(f"Request error: {e}")
-        return jsonify({"error": "Request failed. Please try again."}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        logger.error("Request error: %s", e)
+        return _json({"error": "Request failed. Please try again."}, 500)
+    except Exception:
+        logger.exception("Unexpected error")
+        return _json({"error": "Internal server error"}, 500)
+
+@app.route('/api/search-batch', methods=['POST'])
+def search_batch():
+    """
+    Run several searches concurrently
+    
+    Expected JSON payload:
+    {
+        "queries": [
+            {"text": "maison", "category": "IMMOBILIER"},
+            {"text": "velo", "page": 2}
+        ]
+    }
+    
+    Each query accepts the same fields as /api/search. Results are returned in
+    the same order, a query that failed is replaced by {"error": "..."}.
+    """
+    try:
+        data = _load_json()
+        if not data:
+            return _json({"error": "No JSON data provided"}, 400)
+        
+        if not isinstance(data, dict):
+            return _json({"error": "The request body must be a JSON object"}, 400)
+        
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not queries:
+            return _json({"error": "'queries' must be a non-empty list"}, 400)
+        if len(queries) > _MAX_BATCH_SEARCHES:
+            return _json({"error": f"At most {_MAX_BATCH_SEARCHES} queries can be run at once"}, 400)
+        fields = _requested_fields()
+        
+        # An invalid query only fails its own entry, the others still run
+        bodies = []
+        for future in _map_bounded(_batch_search_body, queries, fields):
+            try:
+                bodies.append(future.result())
+            except InvalidValue as e:
+                bodies.append(_dumps({"error": str(e)}))
+            except DatadomeError as e:
+                logger.error("Datadome error: %s", e)
+                bodies.append(_dumps({"error": "Access blocked by Datadome protection. Please try again later."}))
+            except RequestError as e:
+                logger.error("Request error: %s", e)
+                bodies.append(_dumps({"error": "Request failed. Please try again."}))
+            except Exception:
+                logger.exception("Unexpected error")
+                bodies.append(_dumps({"error": "Internal server error"}))
+        
+        return Response(b'{"results":[' + b','.join(bodies) + b']}', mimetype='application/json')
+        
+    except InvalidValue as e:
+        return _json({"error": str(e)}, 400)
+    except Exception:
+        logger.exception("Unexpected error")
+        return _json({"error": "Internal server error"}, 500)
 
 @app.route('/api/search-url', methods=['POST'])
 def search_by_url():
@@ -354,78 +910,34 @@ def search_by_url():
     }
     """
     try:
-        data = request.get_json()
+        data = _load_json()
         if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+            return _json({"error": "No JSON data provided"}, 400)
         
-        url = data.get('url')
-        if not url:
-            return jsonify({"error": "URL is required"}), 400
+        search = SearchByUrlRequest._build(data)
+        fields = _requested_fields()
         
-        page = data.get('page', 1)
-        limit = data.get('limit', 35)
+        cache_key = search.cache_key + (fields,)
+        cached, max_age = _response_cache.get_with_ttl(cache_key)
+        if cached is not None:
+            return _conditional(_cacheable(Response(cached, mimetype='application/json'), max_age))
         
         # Perform search using URL
-        result = client.search(url=url, page=page, limit=limit)
-        
-        # Convert result to JSON-serializable format
-        response_data = {
-            "total": result.total,
-            "total_all": result.total_all,
-            "total_pro": result.total_pro,
-            "total_private": result.total_private,
-            "total_active": result.total_active,
-            "total_inactive": result.total_inactive,
-            "total_shippable": result.total_shippable,
-            "max_pages": result.max_pages,
-            "ads": []
-        }
+        result = get_client().search(url=search.url, page=search.page, limit=search.limit)
         
-        for ad in result.ads:
-            ad_data = {
-                "id": ad.id,
-                "title": ad.subject,
-                "description": ad.body,
-                "price": ad.price,
-                "url": ad.url,
-                "images": ad.images,
-                "category_name": ad.category_name,
-                "ad_type": ad.ad_type,
-                "first_publication_date": ad.first_publication_date,
-                "expiration_date": ad.expiration_date,
-                "location": {
-                    "city": ad.location.city,
-                    "region_name": ad.location.region_name,
-                    "department_name": ad.location.department_name,
-                    "zipcode": ad.location.zipcode,
-                    "lat": ad.location.lat,
-                    "lng": ad.location.lng
-                },
-                "attributes": [
-                    {
-                        "key": attr.key,
-                        "key_label": attr.key_label,
-                        "value": attr.value,
-                        "value_label": attr.value_label
-                    }
-                    for attr in ad.attributes
-                ],
-                "has_phone": ad.has_phone,
-                "user_id": ad._user_id
-            }
-            response_data["ads"].append(ad_data)
-        
-        return jsonify(response_data)
+        return _cacheable(Response(_stream_search(result, cache_key, fields), mimetype='application/json'))
         
+    except InvalidValue as e:
+        return _json({"error": str(e)}, 400)
     except DatadomeError as e:
-        logger.error(f"Datadome error: {e}")
-        return jsonify({"error": "Access blocked by Datadome protection. Please try again later."}), 403
+        logger.error("Datadome error: %s", e)
+        return _json({"error": "Access blocked by Datadome protection. Please try again later."}, 403)
     except RequestError as e:
-        logger.error(f"Request error: {e}")
-        return jsonify({"error": "Request failed. Please try again."}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        logger.error("Request error: %s", e)
+        return _json({"error": "Request failed. Please try again."}, 500)
+    except Exception:
+        logger.exception("Unexpected error")
+        return _json({"error": "Internal server error"}, 500)
 
 @app.route('/api/ad/<ad_id>', methods=['GET'])
 def get_ad(ad_id):
@@ -435,63 +947,90 @@ def get_ad(ad_id):
     URL parameter: ad_id - The ID of the ad
     """
     try:
-        ad = client.get_ad(ad_id)
-        
-        # Convert ad to JSON-serializable format
-        ad_data = {
-            "id": ad.id,
-            "title": ad.subject,
-            "description": ad.body,
-            "price": ad.price,
-            "url": ad.url,
-            "images": ad.images,
-            "category_name": ad.category_name,
-            "ad_type": ad.ad_type,
-            "first_publication_date": ad.first_publication_date,
-            "expiration_date": ad.expiration_date,
-            "location": {
-                "city": ad.location.city,
-                "region_name": ad.location.region_name,
-                "department_name": ad.location.department_name,
-                "zipcode": ad.location.zipcode,
-                "lat": ad.location.lat,
-                "lng": ad.location.lng
-            },
-            "attributes": [
-                {
-                    "key": attr.key,
-                    "key_label": attr.key_label,
-                    "value": attr.value,
-                    "value_label": attr.value_label
-                }
-                for attr in ad.attributes
-            ],
-            "has_phone": ad.has_phone,
-            "favorites": ad.favorites,
-            "user": {
-                "id": ad.user.id,
-                "name": ad.user.name,
-                "pro": ad.user.pro,
-                "account_type": ad.user.account_type,
-                "creation_date": ad.user.creation_date,
-                "phone_verified": ad.user.phone_verified,
-                "email_verified": ad.user.email_verified
+        cache_key = ("ad", ad_id)
+        body, max_age = _response_cache.get_with_ttl(cache_key)
+        if body is None:
+            ad = get_client().get_ad(ad_id)
+            
+            # Convert ad to JSON-serializable format
+            summary = _ad_to_dict(ad)
+            _response_cache.set(("ad-summary", ad_id), summary)
+            ad_data = {
+                **summary,
+                "favorites": ad.favorites,
+                "user": _user_to_dict(ad.user)
             }
-        }
+            body = _dumps(ad_data)
+            _response_cache.set(cache_key, body)
+            max_age = CACHE_TTL
         
-        return jsonify(ad_data)
+        return _conditional(_cacheable(Response(body, mimetype='application/json'), max_age))
         
     except NotFoundError:
-        return jsonify({"error": "Ad not found"}), 404
+        return _json({"error": "Ad not found"}, 404)
     except DatadomeError as e:
-        logger.error(f"Datadome error: {e}")
-        return jsonify({"error": "Access blocked by Datadome protection. Please try again later."}), 403
+        logger.error("Datadome error: %s", e)
+        return _json({"error": "Access blocked by Datadome protection. Please try again later."}, 403)
     except RequestError as e:
-        logger.error(f"Request error: {e}")
-        return jsonify({"error": "Request failed. Please try again."}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        logger.error("Request error: %s", e)
+        return _json({"error": "Request failed. Please try again."}, 500)
+    except Exception:
+        logger.exception("Unexpected error")
+        return _json({"error": "Internal server error"}, 500)
+
+@app.route('/api/ads', methods=['POST'])
+def get_ads():
+    """
+    Get detailed information about several ads, fetched concurrently
+    
+    Expected JSON payload:
+    {
+        "ids": ["1234567890", "1234567891"]
+    }
+    """
+    try:
+        data = _load_json()
+        if not data:
+            return _json({"error": "No JSON data provided"}, 400)
+        
+        if not isinstance(data, dict):
+            return _json({"error": "The request body must be a JSON object"}, 400)
+        
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return _json({"error": "'ids' must be a non-empty list"}, 400)
+        if len(ids) > _MAX_BATCH_ADS:
+            return _json({"error": f"At most {_MAX_BATCH_ADS} ids can be requested at once"}, 400)
+        if not all(isinstance(ad_id, (str, int)) and str(ad_id).isdigit() for ad_id in ids):
+            return _json({"error": "Ad ids must be numeric"}, 400)
+        fields = _requested_fields()
+        
+        # Each fetch goes through the proxy rotation and rate limiter like searches do.
+        # If one fails the whole request fails, closing the futures cancels the remaining fetches.
+        ads = []
+        not_found = []
+        with contextlib.closing(_map_bounded(_ad_summary, ids)) as futures:
+            for ad_id, future in zip(ids, futures):
+                try:
+                    summary = future.result()
+                except NotFoundError:
+                    not_found.append(ad_id)
+                    continue
+                ads.append({name: summary[name] for name in fields} if fields else summary)
+        
+        return _json({"ads": ads, "not_found": not_found})
+        
+    except InvalidValue as e:
+        return _json({"error": str(e)}, 400)
+    except DatadomeError as e:
+        logger.error("Datadome error: %s", e)
+        return _json({"error": "Access blocked by Datadome protection. Please try again later."}, 403)
+    except RequestError as e:
+        logger.error("Request error: %s", e)
+        return _json({"error": "Request failed. Please try again."}, 500)
+    except Exception:
+        logger.exception("Unexpected error")
+        return _json({"error": "Internal server error"}, 500)
 
 @app.route('/api/user/<user_id>', methods=['GET'])
 def get_user(user_id):
@@ -501,85 +1040,102 @@ def get_user(user_id):
     URL parameter: user_id - The ID of the user
     """
     try:
-        user = client.get_user(user_id)
-        
-        # Convert user to JSON-serializable format
-        user_data = {
-            "id": user.id,
-            "name": user.name,
-            "pro": user.pro,
-            "account_type": user.account_type,
-            "creation_date": user.creation_date,
-            "phone_verified": user.phone_verified,
-            "email_verified": user.email_verified
-        }
-        
-        # Add professional data if available
-        if user.pro:
-            user_data["professional"] = {
-                "online_store_name": user.pro.online_store_name,
-                "siret": user.pro.siret,
-                "website_url": user.pro.website_url,
-                "description": user.pro.description,
-                "phone": user.pro.phone,
-                "email": user.pro.email
-            }
+        cache_key = ("user", user_id)
+        body, max_age = _response_cache.get_with_ttl(cache_key)
+        if body is None:
+            user = get_client().get_user(user_id)
+            
+            # Convert user to JSON-serializable format
+            user_data = _user_to_dict(user)
+            
+            # Add professional data if available
+            if user.pro:
+                user_data["professional"] = {
+                    "online_store_name": user.pro.online_store_name,
+                    "siret": user.pro.siret,
+                    "website_url": user.pro.website_url,
+                    "description": user.pro.description,
+                    "phone": user.pro.phone,
+                    "email": user.pro.email
+                }
+            
+            body = _dumps(user_data)
+            _response_cache.set(cache_key, body)
+            max_age = CACHE_TTL
         
-        return jsonify(user_data)
+        return _conditional(_cacheable(Response(body, mimetype='application/json'), max_age))
         
     except NotFoundError:
-        return jsonify({"error": "User not found"}), 404
+        return _json({"error": "User not found"}, 404)
     except DatadomeError as e:
-        logger.error(f"Datadome error: {e}")
-        return jsonify({"error": "Access blocked by Datadome protection. Please try again later."}), 403
+        logger.error("Datadome error: %s", e)
+        return _json({"error": "Access blocked by Datadome protection. Please try again later."}, 403)
     except RequestError as e:
-        logger.error(f"Request error: {e}")
-        return jsonify({"error": "Request failed. Please try again."}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        logger.error("Request error: %s", e)
+        return _json({"error": "Request failed. Please try again."}, 500)
+    except Exception:
+        logger.exception("Unexpected error")
+        return _json({"error": "Internal server error"}, 500)
 
 def serialize_enum(enum_class):
     """Helper function to serialize enum values to JSON"""
-    items = []
-    for attr_name in dir(enum_class):
-        if not attr_name.startswith('_'):
-            value = getattr(enum_class, attr_name)
-            # Convert enum value to JSON-serializable format
-            if hasattr(value, 'value'):
-                items.append({
-                    "name": attr_name,
-                    "value": str(value.value)
-                })
-            else:
-                items.append({
-                    "name": attr_name,
-                    "value": str(value)
-                })
-    return items
+    return [
+        {"name": name, "value": str(member.value)}
+        for name, member in enum_class.__members__.items()
+    ]
+
+# Enum payloads never change for the lifetime of the process, serialize them once
+_CATEGORIES_JSON = orjson.dumps({"categories": serialize_enum(Category)})
+_SORT_OPTIONS_JSON = orjson.dumps({"sort_options": serialize_enum(Sort)})
+_AD_TYPES_JSON = orjson.dumps({"ad_types": serialize_enum(AdType)})
+_CATEGORIES_ETAG = _etag(_CATEGORIES_JSON)
+_SORT_OPTIONS_ETAG = _etag(_SORT_OPTIONS_JSON)
+_AD_TYPES_ETAG = _etag(_AD_TYPES_JSON)
+# They only change on deploy, let browsers and CDNs keep them for a day
+_ENUM_CACHE_CONTROL = 'public, max-age=86400'
+
+def _precompress(body):
+    """Compress a static body once for each algorithm Flask-Compress could pick, small bodies are left as is"""
+    if len(body) < app.config['COMPRESS_MIN_SIZE']:
+        return {}
+    response = Response(body)
+    return {algorithm: _compress.compress(app, response, algorithm) for algorithm in _compress.enabled_algorithms}
+
+_CATEGORIES_ENCODED = _precompress(_CATEGORIES_JSON)
+_SORT_OPTIONS_ENCODED = _precompress(_SORT_OPTIONS_JSON)
+_AD_TYPES_ENCODED = _precompress(_AD_TYPES_JSON)
+
+def _enum_response(body, etag, encoded):
+    # Flask-Compress leaves responses that already carry a Content-Encoding alone
+    algorithm = request.accept_encodings.best_match(tuple(encoded))
+    if algorithm is None:
+        response = Response(body, mimetype='application/json')
+    else:
+        response = Response(encoded[algorithm], mimetype='application/json')
+        response.headers['Content-Encoding'] = algorithm
+        etag = f'{etag}:{algorithm}'
+    response.headers['Cache-Control'] = _ENUM_CACHE_CONTROL
+    return _conditional(response, etag)
 
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """Get list of available categories"""
-    categories = serialize_enum(Category)
-    return jsonify({"categories": categories})
+    return _enum_response(_CATEGORIES_JSON, _CATEGORIES_ETAG, _CATEGORIES_ENCODED)
 
 @app.route('/api/sort-options', methods=['GET'])
 def get_sort_options():
     """Get list of available sort options"""
-    sort_options = serialize_enum(Sort)
-    return jsonify({"sort_options": sort_options})
+    return _enum_response(_SORT_OPTIONS_JSON, _SORT_OPTIONS_ETAG, _SORT_OPTIONS_ENCODED)
 
 @app.route('/api/ad-types', methods=['GET'])
 def get_ad_types():
     """Get list of available ad types"""
-    ad_types = serialize_enum(AdType)
-    return jsonify({"ad_types": ad_types})
+    return _enum_response(_AD_TYPES_JSON, _AD_TYPES_ETAG, _AD_TYPES_ENCODED)
 
 @app.route('/api/protection/config', methods=['GET'])
 def get_protection_config():
     """Get current Datadome protection configuration"""
-    return jsonify({
+    return _json({
         "min_delay": protection.min_delay,
         "max_delay": protection.max_delay,
         "request_count": protection.request_count,
@@ -591,23 +1147,25 @@ def get_protection_config():
 def update_protection_config():
     """Update Datadome protection configuration"""
     try:
-        data = request.get_json()
+        data = _load_json()
         if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+            return _json({"error": "No JSON data provided"}, 400)
         
         if 'min_delay' in data:
             protection.min_delay = max(1, data['min_delay'])  # Minimum 1 second
         if 'max_delay' in data:
             protection.max_delay = max(protection.min_delay, data['max_delay'])
         
-        return jsonify({
+        return _json({
             "message": "Configuration updated",
             "min_delay": protection.min_delay,
             "max_delay": protection.max_delay
         })
-    except Exception as e:
-        logger.error(f"Error updating protection config: {e}")
-        return jsonify({"error": "Failed to update configuration"}), 500
+    except InvalidValue as e:
+        return _json({"error": str(e)}, 400)
+    except Exception:
+        logger.exception("Error updating protection config")
+        return _json({"error": "Failed to update configuration"}, 500)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for the LBC API
+Start with: gunicorn -c gunicorn_conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Every endpoint spends most of its time waiting on Le Bon Coin, so each
+# worker serves several requests at once from a thread pool. curl_cffi
+# performs its I/O inside libcurl, which gevent cannot monkey-patch, so
+# threads (not greenlets) are what actually overlap the upstream calls.
+# Workers each keep their own LBC sessions and response cache, so favour a few
+# processes with many threads. Both can be overridden from the environment.
+worker_class = "gthread"
+workers = int(os.environ.get('WEB_CONCURRENCY', max(2, multiprocessing.cpu_count())))
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+
+timeout = 60
+# Keep client connections open across requests (longer than typical proxy idle timeouts)
+keepalive = 75
@@ -7,6 +7,7 @@ Run this to test the API locally before deploying to Render
 import requests
 import json
 import time
+import base64
 
 # Configuration
 BASE_URL = "http://localhost:5000"  # Change this to your deployed URL
@@ -71,6 +72,54 @@ def test_search():
     
     return []
 
+def test_search_get():
+    """Test the cacheable GET form of the search endpoint with a field selection"""
+    print("\n🔍 Testing GET search endpoint...")
+    
+    query = base64.urlsafe_b64encode(json.dumps({"text": "maison", "limit": 5}).encode()).decode().rstrip("=")
+    
+    try:
+        response = requests.get(f"{BASE_URL}/api/search", params={"q": query, "fields": "id,title,price"})
+        
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ GET search successful")
+            print(f"   Returned {len(data.get('ads', []))} ads")
+            print(f"   Cache-Control: {response.headers.get('Cache-Control', 'N/A')}")
+        else:
+            print(f"❌ GET search failed: {response.status_code}")
+            print(f"   Error: {response.text}")
+    except Exception as e:
+        print(f"❌ GET search error: {e}")
+
+def test_search_batch():
+    """Test the batch search endpoint, the second query is invalid on purpose"""
+    print("\n🔍 Testing search batch endpoint...")
+    
+    batch_data = {
+        "queries": [
+            {"text": "maison", "limit": 5},
+            {"text": "appartement", "page": 0}
+        ]
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/api/search-batch", json=batch_data)
+        
+        if response.status_code == 200:
+            results = response.json().get('results', [])
+            print("✅ Search batch successful")
+            for query, result in zip(batch_data["queries"], results):
+                if "error" in result:
+                    print(f"   {query['text']}: error {result['error']}")
+                else:
+                    print(f"   {query['text']}: {len(result.get('ads', []))} ads")
+        else:
+            print(f"❌ Search batch failed: {response.status_code}")
+            print(f"   Error: {response.text}")
+    except Exception as e:
+        print(f"❌ Search batch error: {e}")
+
 def test_get_ad(ad_id):
     """Test getting ad details"""
     print(f"\n🔍 Testing get ad endpoint for ID: {ad_id}...")
@@ -90,6 +139,24 @@ def test_get_ad(ad_id):
     except Exception as e:
         print(f"❌ Get ad error: {e}")
 
+def test_get_ads(ad_ids):
+    """Test getting several ads at once"""
+    print(f"\n🔍 Testing get ads endpoint for IDs: {ad_ids}...")
+    
+    try:
+        response = requests.post(f"{BASE_URL}/api/ads", json={"ids": ad_ids})
+        
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ Get ads successful")
+            print(f"   Returned {len(data.get('ads', []))} ads")
+            print(f"   Not found: {data.get('not_found', [])}")
+        else:
+            print(f"❌ Get ads failed: {response.status_code}")
+            print(f"   Error: {response.text}")
+    except Exception as e:
+        print(f"❌ Get ads error: {e}")
+
 def test_get_user(user_id):
     """Test getting user details"""
     print(f"\n🔍 Testing get user endpoint for ID: {user_id}...")
@@ -140,8 +207,14 @@ def main():
     # Test search
     ads = test_search()
     
+    # Test the GET search and the batch search
+    test_search_get()
+    test_search_batch()
+    
     # Test get ad if we have ads
     if ads:
+        test_get_ads([ad.get('id') for ad in ads[:3]])
+        
         first_ad_id = ads[0].get('id')
         if first_ad_id:
             test_get_ad(first_ad_id)
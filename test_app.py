@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+Test suite for the Flask API wrapping the LBC client library.
+Upstream calls are mocked, the routes are exercised through the Flask test client.
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import Mock, patch
+import json
+import base64
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from lbc.exceptions import DatadomeError, InvalidValue, NotFoundError
+from lbc.models import Category, City, Proxy, User
+
+from test_lbc import _sample_ad, _sample_search_response, _sample_user
+
+try:
+    import app as api
+except ImportError as e:
+    # Flask, Flask-Compress and orjson are only needed by the API, not by the library
+    raise unittest.SkipTest(f"API dependencies are not installed: {e}")
+
+
+def _fake_fetch(method, url, payload=None, **kwargs):
+    """Answer `Client._fetch` from the sample payloads, ad id 404 is missing."""
+    if "finder/search" in url:
+        return _sample_search_response()
+    if "user-card" in url:
+        return _sample_user()
+    if url.endswith("/404"):
+        raise NotFoundError("Ad not found")
+    return _sample_ad()
+
+
+def _search_query(data):
+    """Encode a search payload as the base64url `q` parameter."""
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+
+
+class APITestCase(unittest.TestCase):
+    """Base class patching the upstream calls, the rate limiter delays and the response cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up a Flask test client shared by the class."""
+        cls.http = api.app.test_client()
+
+    def setUp(self):
+        """Patch the network calls and start every test with empty caches."""
+        for patcher in (
+            patch('lbc.session.Session._init_session'),
+            patch.object(api.protection, 'min_delay', 0),
+            patch.object(api.protection, 'max_delay', 0),
+            patch.object(api.protection, '_clients', {}),
+            patch.object(api, '_response_cache', api.TTLCache(ttl=api.CACHE_TTL)),
+            # The API serializes these `User` fields, which the lbc model does not define
+            patch.object(User, 'creation_date', None, create=True),
+            patch.object(User, 'phone_verified', None, create=True),
+            patch.object(User, 'email_verified', None, create=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        fetch_patcher = patch('lbc.client.Client._fetch', side_effect=_fake_fetch)
+        self.mock_fetch = fetch_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+
+
+class TestSearchEndpoint(APITestCase):
+    """Test /api/search."""
+
+    def test_search_get_query(self):
+        """Test the GET form of the search, and that a repeated search is cached."""
+        q = _search_query({"text": "maison"})
+        response = self.http.get(f'/api/search?q={q}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["ads"][0]["id"], 1234567890)
+
+        response = self.http.head(f'/api/search?q={q}')
+        self.assertEqual(response.status_code, 200)
+        self.mock_fetch.assert_called_once()
+
+    def test_search_head_fills_cache(self):
+        """Test that a HEAD on a cache miss caches the search for the next requests."""
+        q = _search_query({"text": "maison"})
+        for _ in range(3):
+            response = self.http.head(f'/api/search?q={q}')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('ETag', response.headers)
+
+        response = self.http.get(f'/api/search?q={q}')
+        self.assertEqual(response.get_json()["ads"][0]["id"], 1234567890)
+        self.mock_fetch.assert_called_once()
+
+    def test_search_fields(self):
+        """Test the `fields` projection and the unknown field error."""
+        response = self.http.post('/api/search?fields=id,price', json={"text": "maison"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["ads"], [{"id": 1234567890, "price": 500000.0}])
+
+        response = self.http.post('/api/search?fields=id,unknown', json={"text": "maison"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "Unknown fields: unknown"})
+
+    def test_search_invalid_json(self):
+        """Test that a body that is not valid JSON is rejected."""
+        for path in ('/api/search', '/api/search-url', '/api/search-batch', '/api/ads'):
+            with self.subTest(path=path):
+                response = self.http.post(path, data=b'{"text": ', content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(), {"error": "Request body is not valid JSON."})
+
+    def test_search_get_invalid_query(self):
+        """Test that a malformed `q` parameter is rejected."""
+        response = self.http.get('/api/search?q=not-json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestCORS(APITestCase):
+    """Test the CORS headers added to every response."""
+
+    def test_wildcard_origin(self):
+        """Test that any origin is allowed by default."""
+        response = self.http.get('/health', headers={'Origin': 'https://example.com'})
+        self.assertEqual(response.headers['Access-Control-Allow-Origin'], '*')
+        self.assertNotIn('Access-Control-Max-Age', response.headers)
+
+    def test_preflight(self):
+        """Test that preflight responses list the allowed methods and headers, and can be cached."""
+        response = self.http.options('/api/search', headers={
+            'Origin': 'https://example.com',
+            'Access-Control-Request-Method': 'POST'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Access-Control-Allow-Origin'], '*')
+        self.assertEqual(response.headers['Access-Control-Allow-Methods'], 'GET, POST, OPTIONS')
+        self.assertEqual(response.headers['Access-Control-Allow-Headers'], 'Content-Type, If-None-Match')
+        self.assertEqual(response.headers['Access-Control-Max-Age'], '86400')
+
+    def test_allow_list(self):
+        """Test that only listed origins are echoed back when CORS_ORIGINS is set."""
+        with patch.object(api, 'CORS_ORIGINS', frozenset({'https://app.example.com'})):
+            response = self.http.get('/health', headers={'Origin': 'https://app.example.com'})
+            self.assertEqual(response.headers['Access-Control-Allow-Origin'], 'https://app.example.com')
+            self.assertIn('Origin', response.headers['Vary'])
+
+            response = self.http.options('/api/search', headers={'Origin': 'https://evil.example.com'})
+            self.assertNotIn('Access-Control-Allow-Origin', response.headers)
+            self.assertNotIn('Access-Control-Allow-Methods', response.headers)
+            self.assertIn('Origin', response.headers['Vary'])
+
+
+class TestConditionalRequests(APITestCase):
+    """Test the ETags and 304 answers of the read-only endpoints."""
+
+    def test_enum_etag(self):
+        """Test that the enum listings answer a matching If-None-Match with a 304."""
+        for path in ('/api/categories', '/api/sort-options', '/api/ad-types'):
+            with self.subTest(path=path):
+                response = self.http.get(path)
+                self.assertEqual(response.status_code, 200)
+                etag = response.headers['ETag']
+
+                response = self.http.get(path, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.get_data(), b'')
+
+                response = self.http.get(path, headers={'If-None-Match': '"stale"'})
+                self.assertEqual(response.status_code, 200)
+
+    def test_enum_cache_control(self):
+        """Test that the enum listings, including their 304s, can be cached for a day."""
+        response = self.http.get('/api/categories')
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=86400')
+
+        response = self.http.get('/api/categories', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=86400')
+
+    def test_ad_etag(self):
+        """Test that an ad answers a matching If-None-Match with a 304 from the cache."""
+        response = self.http.get('/api/ad/1234567890')
+        self.assertEqual(response.status_code, 200)
+        fetches = self.mock_fetch.call_count
+
+        response = self.http.get('/api/ad/1234567890', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.mock_fetch.call_count, fetches)
+
+
+class TestCompression(APITestCase):
+    """Test that compression work is not repeated for unchanged responses."""
+
+    def setUp(self):
+        """Count the bodies compressed by Flask-Compress."""
+        super().setUp()
+        compress_patcher = patch.object(api._compress, 'compress', wraps=api._compress.compress)
+        self.mock_compress = compress_patcher.start()
+        self.addCleanup(compress_patcher.stop)
+
+    def test_enum_listing_precompressed(self):
+        """Test that enum listings are served precompressed and revalidated with a 304."""
+        response = self.http.get('/api/categories', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        etag = response.headers['ETag']
+        self.assertTrue(etag.endswith(':br"'))
+
+        response = self.http.get('/api/categories', headers={'Accept-Encoding': 'gzip, br', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.mock_compress.assert_not_called()
+
+    def test_revalidation_before_compression(self):
+        """Test that a compressed ETag is matched before the ad is compressed again."""
+        headers = {'Accept-Encoding': 'gzip'}
+        response = self.http.get('/api/ad/1234567890', headers=headers)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(self.mock_compress.call_count, 1)
+
+        response = self.http.get('/api/ad/1234567890', headers={**headers, 'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.mock_compress.call_count, 1)
+
+
+class TestResponseCache(APITestCase):
+    """Test the in-memory response cache and the Cache-Control it drives."""
+
+    def test_ttl_cache(self):
+        """Test the expiry and the LRU eviction of `TTLCache`."""
+        cache = api.TTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+        expired = api.TTLCache(ttl=-1)
+        expired.set("a", 1)
+        self.assertIsNone(expired.get("a"))
+
+    def test_search_cached(self):
+        """Test that a repeated search is answered from the cache."""
+        for _ in range(2):
+            response = self.http.post('/api/search', json={"text": "maison"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["ads"][0]["id"], 1234567890)
+        self.mock_fetch.assert_called_once()
+
+    def test_ttl_cache_byte_limit(self):
+        """Test that least recently used entries are evicted past `maxbytes`."""
+        cache = api.TTLCache(maxsize=10, ttl=30, maxbytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        self.assertEqual(cache.get("a"), b"1234")
+        cache.set("c", b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1234")
+
+        # Replacing an entry releases the size of the previous value
+        cache.set("a", b"12")
+        cache.set("d", b"1234")
+        self.assertEqual(cache.get("c"), b"1234")
+
+    def test_cache_hit_remaining_max_age(self):
+        """Test that a cache hit is only cacheable for the lifetime it has left."""
+        now = api.time.monotonic()
+        with patch.object(api.time, 'monotonic', return_value=now):
+            response = self.http.get('/api/ad/1234567890')
+        self.assertIn(f'max-age={api.CACHE_TTL},', response.headers['Cache-Control'])
+        fetches = self.mock_fetch.call_count
+
+        with patch.object(api.time, 'monotonic', return_value=now + api.CACHE_TTL - 10):
+            response = self.http.get('/api/ad/1234567890')
+        self.assertIn('max-age=10, s-maxage=10,', response.headers['Cache-Control'])
+        self.assertEqual(self.mock_fetch.call_count, fetches)
+
+    def test_user_revalidation(self):
+        """Test that a cached user answers If-None-Match with a 304."""
+        response = self.http.get('/api/user/user123')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.http.get('/api/user/user123', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_search_limit_capped(self):
+        """Test that pages larger than the cap are rejected."""
+        response = self.http.post('/api/search', json={"text": "maison", "limit": 101})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "'limit' must be at most 100."})
+
+
+@unittest.skipIf(api.redis is None, "redis is not installed")
+class TestSharedRateLimiting(unittest.TestCase):
+    """Test the Redis backed rate limiter and its per-worker fallback."""
+
+    def setUp(self):
+        """Build a limiter against a Redis port that refuses connections."""
+        with patch.object(api, 'REDIS_URL', 'redis://127.0.0.1:1/0'):
+            self.limiter = api.DatadomeProtection()
+        self.limiter.min_delay = self.limiter.max_delay = 1
+        self.proxy = Proxy(host="10.0.0.1", port=8080)
+
+        sleep_patcher = patch.object(api.time, 'sleep')
+        self.mock_sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def test_redis_client_fails_fast(self):
+        """Test that the Redis client neither waits nor retries."""
+        connection_kwargs = self.limiter._rate_limit_script.registered_client.connection_pool.connection_kwargs
+        self.assertEqual(connection_kwargs['socket_connect_timeout'], 0.5)
+        self.assertEqual(connection_kwargs['socket_timeout'], 0.5)
+
+    def test_shared_slot_sleep(self):
+        """Test that the wait returned by the Lua script is slept, for the proxy's key."""
+        self.limiter._rate_limit_script = Mock(return_value=1500)
+        self.limiter.apply_rate_limiting(self.proxy)
+        self.mock_sleep.assert_called_once_with(1.5)
+        self.assertEqual(self.limiter._rate_limit_script.call_args.kwargs['keys'], ["rl:lbc:10.0.0.1:8080"])
+
+    def test_fallback_and_cooldown(self):
+        """Test that a Redis failure falls back to local limits, and Redis is left alone for a while."""
+        script = Mock(wraps=self.limiter._rate_limit_script)
+        self.limiter._rate_limit_script = script
+
+        self.limiter.apply_rate_limiting(self.proxy)
+        self.limiter.apply_rate_limiting(self.proxy)
+        script.assert_called_once()
+        self.mock_sleep.assert_called_once()
+
+        with patch.object(api.time, 'monotonic', return_value=api.time.monotonic() + api._REDIS_COOLDOWN):
+            self.limiter.apply_rate_limiting(self.proxy)
+        self.assertEqual(script.call_count, 2)
+
+
+class TestRetry(unittest.TestCase):
+    """Test the Datadome retries of `DatadomeProtection`."""
+
+    def setUp(self):
+        """Patch the backoff sleep."""
+        sleep_patcher = patch.object(api.time, 'sleep')
+        self.mock_sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def test_retry_without_backoff(self):
+        """Test that retries through the next proxy are issued right away."""
+        func = Mock(side_effect=[DatadomeError("blocked"), DatadomeError("blocked"), "ok"])
+        self.assertEqual(api.protection.retry_with_backoff(func, backoff=False), "ok")
+        self.assertEqual(func.call_count, 3)
+        self.mock_sleep.assert_not_called()
+
+    def test_retry_with_backoff(self):
+        """Test that direct connections back off between attempts and give up after the last one."""
+        func = Mock(side_effect=DatadomeError("blocked"))
+        with self.assertRaises(DatadomeError):
+            api.protection.retry_with_backoff(func, max_retries=3)
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(self.mock_sleep.call_count, 2)
+
+    def test_proxied_search_rotates(self):
+        """Test that a blocked search is retried through the next proxy without sleeping."""
+        proxies = [Proxy(host=f"10.0.0.{i}", port=8080) for i in range(2)]
+        with patch.object(api.DatadomeProtection, '_load_proxies', return_value=proxies):
+            protection = api.DatadomeProtection()
+        protection.min_delay = protection.max_delay = 0
+
+        used = []
+        def call(client):
+            used.append(client)
+            if len(used) == 1:
+                raise DatadomeError("blocked")
+            return "ok"
+
+        with patch.object(api, 'protection', protection), patch('lbc.session.Session._init_session'):
+            self.assertEqual(api._with_protection(call), "ok")
+        self.assertIsNot(used[0], used[1])
+        self.mock_sleep.assert_not_called()
+
+
+class TestSearchRequest(unittest.TestCase):
+    """Test the validation of search payloads."""
+
+    def test_build(self):
+        """Test that names and locations are converted to their lbc types."""
+        search = api.SearchRequest._build({
+            "text": "maison",
+            "category": "immobilier",
+            "locations": [{"type": "city", "lat": 48.86, "lng": 2.34, "city": "Paris"}],
+            "price": [1, 2]
+        })
+        self.assertEqual(search.category, Category.IMMOBILIER)
+        self.assertIsInstance(search.locations[0], City)
+        self.assertEqual(search.filters, {"price": [1, 2]})
+        self.assertEqual((search.page, search.limit), (1, 35))
+
+    def test_build_invalid(self):
+        """Test that unusable payloads raise `InvalidValue`."""
+        for data in (
+            [],
+            {"text": 1},
+            {"page": 0},
+            {"limit": True},
+            {"locations": [{"type": "city", "lat": 48.86}]},
+            {"locations": [{"type": "city", "lat": "48.86", "lng": 2.34}]},
+        ):
+            with self.subTest(data=data):
+                with self.assertRaises(InvalidValue):
+                    api.SearchRequest._build(data)
+
+    def test_cache_key(self):
+        """Test that equivalent searches share a cache key."""
+        build = api.SearchRequest._build
+        location = {"type": "city", "lat": 48.86, "lng": 2.34, "radius": 10000, "city": "Paris"}
+        first = build({"text": "maison", "locations": [location], "price": [1, 2]})
+        second = build({"price": [1, 2], "locations": [dict(reversed(location.items()))], "text": "maison"})
+        self.assertEqual(first.cache_key, second.cache_key)
+        self.assertNotEqual(first.cache_key, build({"text": "maison"}).cache_key)
+        self.assertEqual(api._freeze({"b": [1], "a": 2}), (("a", 2), ("b", (1,))))
+
+
+class TestSearchBatch(APITestCase):
+    """Test /api/search-batch."""
+
+    def test_search_batch(self):
+        """Test that an invalid query only fails its own entry of the batch."""
+        response = self.http.post('/api/search-batch', json={"queries": [{"text": "maison"}, {"text": 1}]})
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual(results[0]["ads"][0]["id"], 1234567890)
+        self.assertEqual(results[1], {"error": "'text' must be a string."})
+
+    def test_search_batch_invalid_body(self):
+        """Test the request level errors of the batch search."""
+        for body in ([{"text": "maison"}], {"queries": []}, {"queries": [{}] * 11}):
+            with self.subTest(body=body):
+                response = self.http.post('/api/search-batch', json=body)
+                self.assertEqual(response.status_code, 400)
+
+
+class TestRateLimiting(unittest.TestCase):
+    """Test the per-worker rate limiting of `DatadomeProtection`."""
+
+    def test_rate_limiting_per_proxy(self):
+        """Test that requests through different proxies don't wait for each other."""
+        limiter = api.DatadomeProtection()
+        limiter.min_delay = limiter.max_delay = 1
+        first, second = Proxy(host="10.0.0.1", port=8080), Proxy(host="10.0.0.2", port=8080)
+
+        with patch.object(api.time, 'sleep') as mock_sleep:
+            limiter.apply_rate_limiting(first)
+            limiter.apply_rate_limiting(second)
+            mock_sleep.assert_not_called()
+
+            limiter.apply_rate_limiting(first)
+            mock_sleep.assert_called_once()
+
+
+class TestSearchByUrlRequest(APITestCase):
+    """Test the validation of /api/search-url payloads."""
+
+    def test_build(self):
+        """Test a valid payload and its defaults."""
+        search = api.SearchByUrlRequest._build({"url": "https://www.leboncoin.fr/recherche?text=maison"})
+        self.assertEqual((search.page, search.limit), (1, 35))
+        self.assertEqual(search.cache_key, ("search-url", "https://www.leboncoin.fr/recherche?text=maison", 1, 35))
+
+    def test_build_invalid(self):
+        """Test that unusable payloads raise `InvalidValue`."""
+        for data in ([], {}, {"url": 1}, {"url": "https://www.leboncoin.fr/recherche", "page": "2"}):
+            with self.subTest(data=data):
+                with self.assertRaises(InvalidValue):
+                    api.SearchByUrlRequest._build(data)
+
+    def test_search_url_invalid(self):
+        """Test that an invalid payload is answered with a 400."""
+        response = self.http.post('/api/search-url', json={"url": 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "'url' must be a string."})
+
+
+class TestAdsEndpoint(APITestCase):
+    """Test /api/ads."""
+
+    def test_get_ads(self):
+        """Test fetching several ads, a missing one is reported in `not_found`."""
+        response = self.http.post('/api/ads?fields=id,title', json={"ids": ["1234567890", "404"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            "ads": [{"id": 1234567890, "title": "Maison à vendre"}],
+            "not_found": ["404"]
+        })
+
+        # The ad summaries are cached
+        self.http.post('/api/ads', json={"ids": ["1234567890"]})
+        self.assertEqual(self.mock_fetch.call_count, 2)
+
+    def test_get_ads_invalid_body(self):
+        """Test the validation errors of the ads endpoint."""
+        for body in (["1234567890"], {"ids": []}, {"ids": ["12a"]}, {"ids": ["1"] * 51}):
+            with self.subTest(body=body):
+                response = self.http.post('/api/ads', json=body)
+                self.assertEqual(response.status_code, 400)
+
+    def test_get_ads_blocked(self):
+        """Test that a Datadome block fails the request."""
+        self.mock_fetch.side_effect = DatadomeError("blocked")
+        with patch.object(api.time, 'sleep'):
+            response = self.http.post('/api/ads', json={"ids": ["1", "2", "3"]})
+        self.assertEqual(response.status_code, 403)
+
+
+class TestBoundedPool(unittest.TestCase):
+    """Test how a single request shares the thread pool."""
+
+    def test_map_bounded_concurrency(self):
+        """Test that at most `_MAX_TASKS_PER_REQUEST` calls run at once, results stay in order."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def work(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(item)
+            return item * 2
+
+        futures = api._map_bounded(work, range(10))
+        self.assertEqual([future.result() for future in futures], [item * 2 for item in range(10)])
+        self.assertLessEqual(max(peak), api._MAX_TASKS_PER_REQUEST)
+
+    def test_map_bounded_stops_early(self):
+        """Test that closing the generator early submits no further calls."""
+        release = threading.Event()
+        started = []
+
+        def work(item):
+            started.append(item)
+            return release.wait(5)
+
+        futures = api._map_bounded(work, range(10))
+        first = next(futures)
+        futures.close()
+        release.set()
+        self.assertTrue(first.result())
+        self.assertLessEqual(len(started), api._MAX_TASKS_PER_REQUEST)
+
+
+class TestProxyRotation(unittest.TestCase):
+    """Test the proxy rotation of `DatadomeProtection`."""
+
+    def test_get_next_proxy_cycles(self):
+        """Test that concurrent callers share the proxies evenly."""
+        proxies = [Proxy(host=f"10.0.0.{i}", port=8080) for i in range(4)]
+        with patch.object(api.DatadomeProtection, '_load_proxies', return_value=proxies):
+            protection = api.DatadomeProtection()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            picked = list(pool.map(lambda _: protection.get_next_proxy(), range(400)))
+        self.assertEqual(Counter(proxy.host for proxy in picked), {proxy.host: 100 for proxy in proxies})
+
+    def test_get_next_proxy_without_proxies(self):
+        """Test that no proxy is returned when none are loaded."""
+        with patch.object(api.DatadomeProtection, '_load_proxies', return_value=[]):
+            protection = api.DatadomeProtection()
+        self.assertIsNone(protection.get_next_proxy())
+
+
+if __name__ == "__main__":
+    unittest.main()